@@ -82,6 +82,22 @@ func (a *App) SyncLibrary() (string, error) {
 		return "", fmt.Errorf("paths not set")
 	}
 
+	// The library walk and the database read touch different files and do not depend
+	// on each other, so read the database in the background while the library is scanned.
+	type databaseResult struct {
+		records       []serato.Record
+		pfilSet       map[string]struct{}
+		libraryPrefix string
+		err           error
+	}
+	dbPath := filepath.Join(a.config.SeratoDBPath, "database V2")
+	a.logMessage(fmt.Sprintf("Reading Serato database at %s...", dbPath))
+	dbResult := make(chan databaseResult, 1)
+	go func() {
+		records, pfilSet, libraryPrefix, err := serato.ReadDatabaseV2(dbPath, a.config.MusicLibraryPath)
+		dbResult <- databaseResult{records, pfilSet, libraryPrefix, err}
+	}()
+
 	// 2. Scan library
 	a.logMessage(fmt.Sprintf("Scanning music library at %s...", a.config.MusicLibraryPath))
 	libraryMap, err := library.ScanLibrary(a.config.MusicLibraryPath)
@@ -93,24 +109,24 @@ func (a *App) SyncLibrary() (string, error) {
 	a.logMessage(fmt.Sprintf("Found %d directories and %d audio files.", numDirs, numFiles))
 
 	// Log first 5 files found
-	filesLogged := 0
+	var sampleLines []string
 	for _, files := range libraryMap {
-		if filesLogged >= 5 {
+		if len(sampleLines) >= 5 {
 			break
 		}
 		for _, file := range files {
-			if filesLogged >= 5 {
+			if len(sampleLines) >= 5 {
 				break
 			}
-			a.logMessage(fmt.Sprintf("  - Found library file: %s", file))
-			filesLogged++
+			sampleLines = append(sampleLines, fmt.Sprintf("  - Found library file: %s", file))
 		}
 	}
+	a.logMessages(sampleLines)
 
 	// 3. Read Serato database
-	dbPath := filepath.Join(a.config.SeratoDBPath, "database V2")
-	a.logMessage(fmt.Sprintf("Reading Serato database at %s...", dbPath))
-	existingRecords, pfilSet, libraryPrefix, err := serato.ReadDatabaseV2(dbPath, a.config.MusicLibraryPath)
+	a.logMessage("Waiting for Serato database read...")
+	db := <-dbResult
+	existingRecords, pfilSet, libraryPrefix, err := db.records, db.pfilSet, db.libraryPrefix, db.err
 	if err != nil {
 		a.logMessage(fmt.Sprintf("Error reading database: %v", err))
 		return "", err
@@ -118,86 +134,78 @@ func (a *App) SyncLibrary() (string, error) {
 	a.logMessage(fmt.Sprintf("Found %d tracks in the database for comparison.", len(pfilSet)))
 
 	// Log first 5 tracks found
-	tracksLogged := 0
+	var dbSamples []string
 	for pfil := range pfilSet {
-		if tracksLogged >= 5 {
+		if len(dbSamples) >= 5 {
 			break
 		}
-		a.logMessage(fmt.Sprintf("  - Found DB track for comparison: %s", pfil))
-		tracksLogged++
+		dbSamples = append(dbSamples, fmt.Sprintf("  - Found DB track for comparison: %s", pfil))
 	}
+	a.logMessages(dbSamples)
 
 	a.logMessage(fmt.Sprintf("Using prefix from library path: %s", libraryPrefix))
 
 	// 4. Detect new tracks by comparing relative paths
-	var relativeTrackPaths []string
-	for _, files := range libraryMap {
-		relativeTrackPaths = append(relativeTrackPaths, files...)
-	}
-
-	newRelativePaths := library.DetectNewTracks(relativeTrackPaths, pfilSet)
+	newRelativePaths := library.DetectNewTracks(libraryMap, pfilSet)
 	a.logMessage(fmt.Sprintf("Found %d new tracks.", len(newRelativePaths)))
 
 	// Build set of affected ptrks (full paths of new tracks)
-	affectedPtrks := make(map[string]struct{})
+	affectedPtrks := make(map[string]struct{}, len(newRelativePaths))
 	for _, relPfil := range newRelativePaths {
-		fullPfil := serato.BuildPtrk(libraryPrefix, relPfil)
-		affectedPtrks[fullPfil] = struct{}{}
+		affectedPtrks[serato.BuildPtrk(libraryPrefix, relPfil)] = struct{}{}
 	}
 
 	// 5. Build crate plans (crates need full paths)
 	cratePlans := library.BuildCratePlans(libraryMap, libraryPrefix, a.config.SeratoDBPath)
 
-	// 6. Write crate files only for crates containing affected tracks
-	a.logMessage("Writing crate files...")
+	// 6. Write crate files only for crates containing affected tracks,
+	// gathering them straight into the write batch.
+	var changedPaths []string
+	var changedTracks [][]string
 	for _, plan := range cratePlans {
-		// Check if this crate contains any affected tracks
-		hasAffected := false
 		for _, ptrk := range plan.TrackPaths {
 			if _, ok := affectedPtrks[ptrk]; ok {
-				hasAffected = true
+				changedPaths = append(changedPaths, plan.CratePath)
+				changedTracks = append(changedTracks, plan.TrackPaths)
 				break
 			}
 		}
-		if !hasAffected {
-			continue
-		}
+	}
 
-		err := serato.WriteCrateFile(plan.CratePath, plan.TrackPaths)
-		if err != nil {
-			a.logMessage(fmt.Sprintf("Error writing crate file %s: %v", plan.CratePath, err))
+	a.logMessage("Writing crate files...")
+	writeErrs := serato.WriteCrateFiles(changedPaths, changedTracks)
+
+	crateLines := make([]string, len(changedPaths))
+	for i, cratePath := range changedPaths {
+		if err := writeErrs[i]; err != nil {
+			crateLines[i] = fmt.Sprintf("Error writing crate file %s: %v", cratePath, err)
 		} else {
-			a.logMessage(fmt.Sprintf("Wrote crate file %s with %d tracks.", filepath.Base(plan.CratePath), len(plan.TrackPaths)))
+			crateLines[i] = fmt.Sprintf("Wrote crate file %s with %d tracks.", filepath.Base(cratePath), len(changedTracks[i]))
 			cratesWritten++
-			tracksWritten += len(plan.TrackPaths)
+			tracksWritten += len(changedTracks[i])
 		}
 	}
+	a.logMessages(crateLines)
 
 	// 7. Add new tracks to database
 	if len(newRelativePaths) > 0 {
 		a.logMessage(fmt.Sprintf("Adding %d new tracks to the database...", len(newRelativePaths)))
-		var newRecords []serato.Record
+		allRecords := make([]serato.Record, len(existingRecords), len(existingRecords)+len(newRelativePaths))
+		copy(allRecords, existingRecords)
 		for _, relPfil := range newRelativePaths {
 			// Construct the full path for the database record
 			fullPfil := serato.BuildPtrk(libraryPrefix, relPfil)
-			newRecord := serato.Record{"pfil": fullPfil}
-			newRecords = append(newRecords, newRecord)
-		}
-
-		allRecords := append(existingRecords, newRecords...)
-
-		// Backup database before writing
-		backupPath, err := serato.BackupDatabase(dbPath)
-		if err != nil {
-			a.logMessage(fmt.Sprintf("Error creating database backup: %v", err))
-		} else {
-			a.logMessage(fmt.Sprintf("Database backup created at %s", backupPath))
+			allRecords = append(allRecords, serato.Record{"pfil": fullPfil})
 		}
 
-		err = serato.WriteDatabaseV2Records(dbPath, allRecords)
+		// The replaced database is kept as a backup
+		backupPath, err := serato.WriteDatabaseV2RecordsWithBackup(dbPath, allRecords)
 		if err != nil {
 			a.logMessage(fmt.Sprintf("Error writing updated database: %v", err))
 		} else {
+			if backupPath != "" {
+				a.logMessage(fmt.Sprintf("Database backup created at %s", backupPath))
+			}
 			tracksAddedToDb = len(newRelativePaths)
 			a.logMessage("Successfully updated database with new tracks.")
 		}
@@ -205,17 +213,19 @@ func (a *App) SyncLibrary() (string, error) {
 
 	// --- Final Summary ---
 	summary := "Sync Complete!"
-	a.logMessage("--------------------")
-	a.logMessage("SYNC SUMMARY")
-	a.logMessage("--------------------")
-	a.logMessage(fmt.Sprintf("Music Library Files Scanned: %d", numFiles))
-	a.logMessage(fmt.Sprintf("Serato Database Tracks Before Sync: %d", len(existingRecords)))
-	a.logMessage(fmt.Sprintf("New Tracks Detected: %d", len(newRelativePaths)))
-	a.logMessage(fmt.Sprintf("Tracks Added to Database: %d", tracksAddedToDb))
-	a.logMessage(fmt.Sprintf("Total Tracks in Database After Sync: %d", len(existingRecords)+tracksAddedToDb))
-	a.logMessage(fmt.Sprintf("Crate Files Written/Updated: %d", cratesWritten))
-	a.logMessage(fmt.Sprintf("Total Tracks Written to Crates: %d", tracksWritten))
-	a.logMessage("--------------------")
+	a.logMessages([]string{
+		"--------------------",
+		"SYNC SUMMARY",
+		"--------------------",
+		fmt.Sprintf("Music Library Files Scanned: %d", numFiles),
+		fmt.Sprintf("Serato Database Tracks Before Sync: %d", len(existingRecords)),
+		fmt.Sprintf("New Tracks Detected: %d", len(newRelativePaths)),
+		fmt.Sprintf("Tracks Added to Database: %d", tracksAddedToDb),
+		fmt.Sprintf("Total Tracks in Database After Sync: %d", len(existingRecords)+tracksAddedToDb),
+		fmt.Sprintf("Crate Files Written/Updated: %d", cratesWritten),
+		fmt.Sprintf("Total Tracks Written to Crates: %d", tracksWritten),
+		"--------------------",
+	})
 
 	return summary, nil
 }
@@ -224,6 +234,14 @@ func (a *App) logMessage(message string) {
 	runtime.EventsEmit(a.ctx, "log", message)
 }
 
+// logMessages sends several log lines to the frontend as a single event.
+func (a *App) logMessages(messages []string) {
+	if len(messages) == 0 {
+		return
+	}
+	runtime.EventsEmit(a.ctx, "logs", messages)
+}
+
 // GenerateReport generates a database report.
 func (a *App) GenerateReport() (string, error) {
 	a.logMessage("Generating database report...")
@@ -256,14 +274,6 @@ func (a *App) CleanDatabase() (string, error) {
 
 	dbPath := filepath.Join(a.config.SeratoDBPath, "database V2")
 
-	// Backup database
-	backupPath, err := serato.BackupDatabase(dbPath)
-	if err != nil {
-		a.logMessage(fmt.Sprintf("Error creating backup: %v", err))
-		return "", err
-	}
-	a.logMessage(fmt.Sprintf("Database backup created at %s", backupPath))
-
 	// Read records
 	records, _, _, err := serato.ReadDatabaseV2(dbPath, "")
 	if err != nil {
@@ -274,12 +284,13 @@ func (a *App) CleanDatabase() (string, error) {
 	// Clean records
 	cleanedRecords, stats := serato.CleanDatabaseRecords(records, true, true)
 
-	// Write cleaned records
-	err = serato.WriteDatabaseV2Records(dbPath, cleanedRecords)
+	// Write cleaned records, keeping the replaced database as a backup
+	backupPath, err := serato.WriteDatabaseV2RecordsWithBackup(dbPath, cleanedRecords)
 	if err != nil {
 		a.logMessage(fmt.Sprintf("Error writing cleaned database: %v", err))
 		return "", err
 	}
+	a.logMessage(fmt.Sprintf("Database backup created at %s", backupPath))
 
 	result := fmt.Sprintf("Database cleanup complete.\nOriginal records: %d\nCleaned records: %d", stats.OriginalCount, stats.FinalCount)
 	a.logMessage(result)
@@ -26,6 +26,18 @@ document.addEventListener('DOMContentLoaded', () => {
         logsDiv.scrollTop = logsDiv.scrollHeight;
     });
 
+    // Batched log messages, appended with a single layout and scroll
+    EventsOn('logs', messages => {
+        const fragment = document.createDocumentFragment();
+        for (const message of messages) {
+            const p = document.createElement('p');
+            p.textContent = message;
+            fragment.appendChild(p);
+        }
+        logsDiv.appendChild(fragment);
+        logsDiv.scrollTop = logsDiv.scrollHeight;
+    });
+
     // Button listeners
     browseSeratoDbBtn.addEventListener('click', () => {
         BrowseForDirectory('Select Serato Database Directory').then(path => {
@@ -3,6 +3,8 @@ package library
 import (
 	"os"
 	"path/filepath"
+	"runtime"
+	"sync"
 
 	"seratosync-go/serato"
 )
@@ -10,34 +12,121 @@ import (
 // LibraryMap is a map of relative directory paths to lists of relative file paths.
 type LibraryMap map[string][]string
 
+// scanConcurrency is the number of workers listing directories at once. Listing is
+// dominated by file system latency rather than CPU, so it allows more workers than cores.
+var scanConcurrency = min(32, 4*runtime.NumCPU())
+
+// scanJob is a directory waiting to be listed, with its path relative to the library root.
+type scanJob struct {
+	dir    string
+	relDir string
+}
+
+// libraryScanner lists the library's directories on a fixed pool of workers fed from a
+// shared queue, and collects their audio files.
+type libraryScanner struct {
+	mu         sync.Mutex
+	cond       *sync.Cond
+	queue      []scanJob // directories waiting for a worker
+	pending    int       // directories queued or being listed
+	libraryMap LibraryMap
+	err        error
+}
+
 // ScanLibrary scans the library directory and returns a mapping of relative directories to audio files.
 func ScanLibrary(libraryRoot string) (LibraryMap, error) {
-	libraryMap := make(LibraryMap)
+	s := &libraryScanner{
+		queue:      []scanJob{{dir: libraryRoot, relDir: "."}},
+		pending:    1,
+		libraryMap: make(LibraryMap),
+	}
+	s.cond = sync.NewCond(&s.mu)
+
+	var wg sync.WaitGroup
+	for i := 0; i < scanConcurrency; i++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			s.work()
+		}()
+	}
+	wg.Wait()
 
-	err := filepath.Walk(libraryRoot, func(path string, info os.FileInfo, err error) error {
-		if err != nil {
-			return err
+	if s.err != nil {
+		return nil, s.err
+	}
+
+	return s.libraryMap, nil
+}
+
+// work lists queued directories until every directory has been listed. Once an error
+// has been seen, the remaining queued directories are dropped without being listed.
+func (s *libraryScanner) work() {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+
+	for {
+		for len(s.queue) == 0 && s.pending > 0 {
+			s.cond.Wait()
+		}
+		if s.pending == 0 {
+			return
 		}
 
-		if !info.IsDir() && serato.IsAudioFile(path) {
-			relDir, err := filepath.Rel(libraryRoot, filepath.Dir(path))
-			if err != nil {
-				return err
-			}
-			relFile, err := filepath.Rel(libraryRoot, path)
-			if err != nil {
-				return err
+		job := s.queue[len(s.queue)-1]
+		s.queue = s.queue[:len(s.queue)-1]
+
+		var subdirs []scanJob
+		var files []string
+		var err error
+		if s.err == nil {
+			s.mu.Unlock()
+			subdirs, files, err = scanDir(job)
+			s.mu.Lock()
+		}
+
+		if err != nil && s.err == nil {
+			s.err = err
+		}
+		if s.err == nil {
+			s.queue = append(s.queue, subdirs...)
+			s.pending += len(subdirs)
+			if len(files) > 0 {
+				s.libraryMap[job.relDir] = files
 			}
-			libraryMap[relDir] = append(libraryMap[relDir], relFile)
 		}
-		return nil
-	})
+		s.pending--
+		if s.pending == 0 || len(subdirs) > 0 {
+			s.cond.Broadcast()
+		}
+	}
+}
 
+// scanDir lists one directory, returning its subdirectories to scan and its audio files.
+// Relative paths are built by joining names onto the job's relative directory rather than
+// calling filepath.Rel for every file.
+func scanDir(job scanJob) ([]scanJob, []string, error) {
+	entries, err := os.ReadDir(job.dir)
 	if err != nil {
-		return nil, err
+		return nil, nil, err
 	}
 
-	return libraryMap, nil
+	var subdirs []scanJob
+	var files []string
+	for _, entry := range entries {
+		name := entry.Name()
+		relPath := name
+		if job.relDir != "." {
+			relPath = job.relDir + string(filepath.Separator) + name
+		}
+
+		if entry.IsDir() {
+			subdirs = append(subdirs, scanJob{dir: filepath.Join(job.dir, name), relDir: relPath})
+		} else if serato.IsAudioFile(name) {
+			files = append(files, relPath)
+		}
+	}
+	return subdirs, files, nil
 }
 
 // GetLibraryStats gets statistics from the library scan results.
@@ -58,16 +147,16 @@ type CratePlan struct {
 
 // BuildCratePlans builds crate file plans based on library structure.
 func BuildCratePlans(libraryMap LibraryMap, prefix, seratoRoot string) []CratePlan {
-	var cratePlans []CratePlan
+	cratePlans := make([]CratePlan, 0, len(libraryMap))
 
 	for relDir, files := range libraryMap {
 		if relDir == "." {
 			continue // Skip root directory
 		}
 
-		var newPtrks []string
-		for _, f := range files {
-			newPtrks = append(newPtrks, serato.BuildPtrk(prefix, f))
+		newPtrks := make([]string, len(files))
+		for i, f := range files {
+			newPtrks[i] = serato.BuildPtrk(prefix, f)
 		}
 
 		crateFile := serato.CratePathForDir(seratoRoot, relDir)
@@ -77,13 +166,15 @@ func BuildCratePlans(libraryMap LibraryMap, prefix, seratoRoot string) []CratePl
 	return cratePlans
 }
 
-// DetectNewTracks detects which tracks are new (not in existing database).
-func DetectNewTracks(trackPaths []string, existingPfilSet map[string]struct{}) []string {
+// DetectNewTracks detects which tracks in the library are new (not in existing database).
+func DetectNewTracks(libraryMap LibraryMap, existingPfilSet map[string]struct{}) []string {
 	var newTracks []string
-	for _, p := range trackPaths {
-		cleaned := serato.CleanPath(p)
-		if _, ok := existingPfilSet[cleaned]; !ok {
-			newTracks = append(newTracks, p)
+	for _, files := range libraryMap {
+		for _, p := range files {
+			cleaned := serato.ComparablePath(p)
+			if _, ok := existingPfilSet[cleaned]; !ok {
+				newTracks = append(newTracks, p)
+			}
 		}
 	}
 	return newTracks
@@ -6,6 +6,7 @@ import (
 	"os"
 	"strings"
 	"time"
+	"unicode"
 )
 
 // CleanupStats holds the statistics of the database cleanup operation.
@@ -47,7 +48,7 @@ func CleanDatabaseRecords(records []Record, removeDuplicates, requireMetadata bo
 		}
 
 		if removeDuplicates {
-			normalizedPath := strings.ToLower(strings.ReplaceAll(pfil, "\\", "/"))
+			normalizedPath := strings.Map(duplicateKeyRune, pfil)
 			if _, seen := seenPaths[normalizedPath]; seen {
 				stats.RemovedDuplicates++
 				continue
@@ -62,27 +63,53 @@ func CleanDatabaseRecords(records []Record, removeDuplicates, requireMetadata bo
 	return cleanedRecords, stats
 }
 
-// BackupDatabase creates a backup of the database file.
-func BackupDatabase(dbPath string) (string, error) {
-	timestamp := time.Now().Unix()
-	backupPath := fmt.Sprintf("%s.backup.%d", dbPath, timestamp)
+// duplicateKeyRune maps backslashes to forward slashes and lowercases everything else,
+// so duplicate detection normalizes a path in one pass.
+func duplicateKeyRune(r rune) rune {
+	if r == '\\' {
+		return '/'
+	}
+	return unicode.ToLower(r)
+}
 
-	source, err := os.Open(dbPath)
-	if err != nil {
+// linkBackup keeps the current database file as a backup by hard-linking it, falling back
+// to a copy where links are unsupported, e.g. across devices or on FAT-formatted drives.
+// The link shares the live file's inode, so it is only safe immediately before that file
+// is replaced by rename; anything rewriting the database in place would change the backup.
+func linkBackup(dbPath string) (string, error) {
+	backupPath := backupPathFor(dbPath)
+	if err := os.Link(dbPath, backupPath); err == nil {
+		return backupPath, nil
+	}
+	if err := copyFile(dbPath, backupPath); err != nil {
 		return "", err
 	}
+	return backupPath, nil
+}
+
+// backupPathFor returns a timestamped backup path next to the database file.
+func backupPathFor(dbPath string) string {
+	return fmt.Sprintf("%s.backup.%d", dbPath, time.Now().Unix())
+}
+
+// copyFile copies the contents of src to a new file at dst.
+func copyFile(src, dst string) error {
+	source, err := os.Open(src)
+	if err != nil {
+		return err
+	}
 	defer source.Close()
 
-	destination, err := os.Create(backupPath)
+	destination, err := os.Create(dst)
 	if err != nil {
-		return "", err
+		return err
 	}
 	defer destination.Close()
 
 	_, err = io.Copy(destination, source)
 	if err != nil {
-		return "", err
+		return err
 	}
 
-	return backupPath, nil
+	return destination.Close()
 }
@@ -23,105 +23,80 @@ var AudioExts = map[string]struct{}{
 // CrateVrsn is the version string for crate files.
 const CrateVrsn = "1.0/Serato ScratchLive Crate"
 
+// crateVrsnChunk is the encoded version header written at the start of every crate file.
+var crateVrsnChunk = tlv.AppendU16BEChunk(nil, "vrsn", CrateVrsn)
+
+// maxExtLen bounds the extensions IsAudioFile will look up; longer ones cannot be audio.
+const maxExtLen = 16
+
 // IsAudioFile checks if a path is an audio file with an allowed extension.
 func IsAudioFile(path string) bool {
-	ext := strings.ToLower(filepath.Ext(path))
-	_, ok := AudioExts[ext]
+	ext := filepath.Ext(path)
+	if len(ext) > maxExtLen {
+		return false
+	}
+	// Lowercase into a stack buffer; the map lookup on string(lower) does not allocate.
+	var lower [maxExtLen]byte
+	for i := 0; i < len(ext); i++ {
+		c := ext[i]
+		if 'A' <= c && c <= 'Z' {
+			c += 'a' - 'A'
+		}
+		lower[i] = c
+	}
+	_, ok := AudioExts[string(lower[:len(ext)])]
 	return ok
 }
 
 // CratePathForDir generates the crate file path for a directory.
 func CratePathForDir(seratoRoot, dirRel string) string {
-	subcratesDir := filepath.Join(seratoRoot, "Subcrates")
 	// Join path components with '%%' for the crate filename
 	crateName := strings.ReplaceAll(dirRel, string(filepath.Separator), "%%") + ".crate"
-	return filepath.Join(subcratesDir, crateName)
+	return filepath.Join(seratoRoot, "Subcrates", crateName)
 }
 
 // BuildPtrk builds a ptrk (track path) string for a relative file.
 func BuildPtrk(prefix, relFile string) string {
-	parts := []string{}
-	if prefix != "" {
-		parts = append(parts, prefix)
+	if prefix == "" {
+		return filepath.ToSlash(relFile)
 	}
-	parts = append(parts, strings.Split(relFile, string(filepath.Separator))...)
-	return strings.Join(parts, "/")
+	return prefix + "/" + filepath.ToSlash(relFile)
 }
 
-// WriteCrateFile writes a crate file with the given track paths.
-func WriteCrateFile(outfile string, trackPaths []string) error {
-	err := os.MkdirAll(filepath.Dir(outfile), 0755)
-	if err != nil {
-		return err
-	}
-
-	file, err := os.Create(outfile)
-	if err != nil {
-		return err
-	}
-	defer file.Close()
-
-	vrsnPayload, err := tlv.EncodeU16BE(CrateVrsn)
-	if err != nil {
-		return err
-	}
-	err = tlv.WriteChunk(file, "vrsn", vrsnPayload)
-	if err != nil {
-		return err
-	}
+// writeCrate encodes and writes a crate file whose parent directory already exists.
+func writeCrate(outfile string, trackPaths []string) error {
+	// Build the whole crate in memory so it reaches the disk in a single write.
+	buf := append([]byte(nil), crateVrsnChunk...)
 
+	var inner []byte
 	for _, pathStr := range trackPaths {
-		ptrkPayload, err := tlv.EncodeU16BE(pathStr)
-		if err != nil {
-			// Log or handle error, for now we skip the track
-			continue
-		}
-		inner := tlv.MakeChunk("ptrk", ptrkPayload)
-		err = tlv.WriteChunk(file, "otrk", inner)
-		if err != nil {
-			// Log or handle error
-			continue
-		}
+		inner = tlv.AppendU16BEChunk(inner[:0], "ptrk", pathStr)
+		buf = tlv.AppendChunk(buf, "otrk", inner)
 	}
 
-	return nil
+	return os.WriteFile(outfile, buf, 0666)
 }
 
-// ReadCrateFile reads an existing crate file and extracts track paths.
-func ReadCrateFile(cratePath string) ([]string, error) {
-	if _, err := os.Stat(cratePath); os.IsNotExist(err) {
-		return []string{}, nil
-	}
-
-	file, err := os.Open(cratePath)
-	if err != nil {
-		return nil, err
-	}
-	defer file.Close()
-
-	chunks, err := tlv.IterTLV(file)
-	if err != nil {
-		return nil, err
-	}
-
-	var trackPaths []string
-	for _, chunk := range chunks {
-		if chunk.Tag == "otrk" {
-			nestedChunks, err := tlv.IterNestedTLV(chunk.Value)
-			if err != nil {
-				continue
-			}
-			for _, nestedChunk := range nestedChunks {
-				if nestedChunk.Tag == "ptrk" {
-					pathStr, err := tlv.DecodeU16BE(nestedChunk.Value)
-					if err != nil {
-						continue
-					}
-					trackPaths = append(trackPaths, pathStr)
-				}
-			}
+// WriteCrateFiles writes several crate files concurrently.
+// trackPaths[i] holds the tracks for cratePaths[i]; the returned errors follow the same order.
+func WriteCrateFiles(cratePaths []string, trackPaths [][]string) []error {
+	// Crates usually share a single Subcrates directory, so create each distinct
+	// parent once instead of stat'ing it again for every crate.
+	dirErrs := make(map[string]error)
+	for _, cratePath := range cratePaths {
+		dir := filepath.Dir(cratePath)
+		if _, done := dirErrs[dir]; !done {
+			dirErrs[dir] = os.MkdirAll(dir, 0755)
 		}
 	}
 
-	return trackPaths, nil
+	errs := make([]error, len(cratePaths))
+	parallelFor(len(cratePaths), func(i int) {
+		if err := dirErrs[filepath.Dir(cratePaths[i])]; err != nil {
+			errs[i] = err
+			return
+		}
+		errs[i] = writeCrate(cratePaths[i], trackPaths[i])
+	})
+	return errs
 }
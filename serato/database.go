@@ -1,14 +1,22 @@
 package serato
 
 import (
+	"bufio"
 	"bytes"
 	"fmt"
 	"os"
+	"path/filepath"
 	"strings"
 
 	"seratosync-go/tlv"
 )
 
+// DatabaseVrsn is the version string for Database V2 files.
+const DatabaseVrsn = "2.0/Serato Scratch LIVE Database"
+
+// databaseVrsnChunk is the encoded version header written at the start of Database V2.
+var databaseVrsnChunk = tlv.AppendU16BEChunk(nil, "vrsn", DatabaseVrsn)
+
 // Record represents a track record in the Serato database.
 type Record map[string]interface{}
 
@@ -16,51 +24,70 @@ type Record map[string]interface{}
 // It returns the records, a set of file paths with the library prefix stripped,
 // the calculated library prefix, and any error that occurred.
 func ReadDatabaseV2(path string, musicLibraryPath string) ([]Record, map[string]struct{}, string, error) {
-	file, err := os.Open(path)
+	data, err := os.ReadFile(path)
 	if err != nil {
 		return nil, nil, "", err
 	}
-	defer file.Close()
 
-	chunks, err := tlv.IterTLV(file)
+	chunks, err := tlv.ParseTLV(data)
 	if err != nil {
 		return nil, nil, "", err
 	}
 
-	var records []Record
-	originalPfilSet := make(map[string]struct{})
-
-	for _, chunk := range chunks {
-		if chunk.Tag == "otrk" {
-			record, err := parseRecord(chunk.Value)
-			if err != nil {
-				continue
-			}
-			records = append(records, record)
-
-			if pfil, ok := record["pfil"].(string); ok {
-				cleanedPfil := CleanPath(pfil)
-				originalPfilSet[cleanedPfil] = struct{}{}
-			}
-		}
-	}
-
 	// The prefix to be stripped is the user's music library path, cleaned for comparison.
+	// It is matched in NFC, like the database paths, so an accented folder name in the
+	// library root matches whichever form the file system reported it in.
 	libraryPrefix := CleanPath(musicLibraryPath)
 	prefixWithSlash := ""
 	if libraryPrefix != "" {
-		prefixWithSlash = libraryPrefix + "/"
+		prefixWithSlash = toNFC(libraryPrefix) + "/"
+	}
+
+	// Decoding the UTF-16 fields of each record and normalizing its path are independent
+	// work, so spread them across cores and assemble the results in file order afterwards.
+	var otrkChunks []*tlv.Chunk
+	for _, chunk := range chunks {
+		if chunk.Tag == "otrk" {
+			otrkChunks = append(otrkChunks, chunk)
+		}
 	}
+	parsed := make([]Record, len(otrkChunks))
+	relPfils := make([]string, len(otrkChunks))
+	inLibrary := make([]bool, len(otrkChunks))
+	parallelFor(len(otrkChunks), func(i int) {
+		record, err := parseRecord(otrkChunks[i].Value)
+		if err != nil {
+			return
+		}
+		parsed[i] = record
 
-	// Strip the library prefix from all database paths for accurate comparison.
-	strippedPfilSet := make(map[string]struct{})
-	for pfil := range originalPfilSet {
+		pfil, ok := record["pfil"].(string)
+		if !ok {
+			return
+		}
+		// Strip the library prefix from database paths for accurate comparison.
 		// Only strip the prefix if the path actually has it. Some DB entries might be from other drives.
-		if libraryPrefix == "" || strings.HasPrefix(pfil, prefixWithSlash) {
-			strippedPfilSet[strings.TrimPrefix(pfil, prefixWithSlash)] = struct{}{}
-		} else {
-			// If the path doesn't have the prefix, it's outside our target library.
-			// We can't reliably match it, so we don't include it in the comparison set.
+		// If the path doesn't have the prefix, it's outside our target library.
+		// We can't reliably match it, so we don't include it in the comparison set.
+		// With no library prefix, prefixWithSlash is empty and every path matches.
+		// Cutting at a '/' leaves the remainder in NFC as well.
+		if relPfil, ok := strings.CutPrefix(ComparablePath(pfil), prefixWithSlash); ok {
+			relPfils[i] = relPfil
+			inLibrary[i] = true
+		}
+	})
+
+	// Size both collections for every record up front so neither regrows mid-loop.
+	records := make([]Record, 0, len(parsed))
+	strippedPfilSet := make(map[string]struct{}, len(parsed))
+
+	for i, record := range parsed {
+		if record == nil {
+			continue
+		}
+		records = append(records, record)
+		if inLibrary[i] {
+			strippedPfilSet[relPfils[i]] = struct{}{}
 		}
 	}
 
@@ -91,43 +118,104 @@ func parseRecord(data []byte) (Record, error) {
 	return record, nil
 }
 
-// WriteDatabaseV2Records writes track records back to Database V2.
-func WriteDatabaseV2Records(path string, records []Record) error {
-	file, err := os.Create(path)
+// WriteDatabaseV2RecordsWithBackup writes track records back to Database V2 and keeps the
+// file it replaces as a timestamped backup, returning the backup's path. The backup is
+// taken only once the new file is complete; if no database exists yet, none is made.
+func WriteDatabaseV2RecordsWithBackup(path string, records []Record) (string, error) {
+	// Write to a temporary file next to the database and rename it into place, so the
+	// previous file's inode (and any hard-linked backup of it) is never truncated.
+	file, err := os.CreateTemp(filepath.Dir(path), filepath.Base(path)+".tmp*")
 	if err != nil {
-		return err
+		return "", err
 	}
+	tmpPath := file.Name()
+	defer os.Remove(tmpPath)
 	defer file.Close()
 
-	// Write version header
-	vrsnPayload, err := tlv.EncodeU16BE("2.0/Serato Scratch LIVE Database")
-	if err != nil {
-		return err
+	mode := os.FileMode(0644)
+	existing, statErr := os.Stat(path)
+	if statErr == nil {
+		mode = existing.Mode().Perm()
+	}
+	if err := file.Chmod(mode); err != nil {
+		return "", err
 	}
-	err = tlv.WriteChunk(file, "vrsn", vrsnPayload)
+
+	// Buffer the output so records reach the file in large writes rather than one syscall each.
+	writer := bufio.NewWriterSize(file, 1<<20)
+
+	// Write version header
+	_, err = writer.Write(databaseVrsnChunk)
 	if err != nil {
-		return err
+		return "", err
 	}
 
+	// Each record is encoded into the same scratch buffer, which grows to fit the largest one.
+	var inner []byte
 	for _, record := range records {
-		var inner bytes.Buffer
+		inner = inner[:0]
 		for key, value := range record {
 			switch v := value.(type) {
 			case string:
-				payload, err := tlv.EncodeU16BE(v)
-				if err != nil {
-					return err
-				}
-				inner.Write(tlv.MakeChunk(key, payload))
+				inner = tlv.AppendU16BEChunk(inner, key, v)
 			case []byte:
-				inner.Write(tlv.MakeChunk(key, v))
+				inner = tlv.AppendChunk(inner, key, v)
 			}
 		}
-		err = tlv.WriteChunk(file, "otrk", inner.Bytes())
+		err = tlv.WriteChunk(writer, "otrk", inner)
 		if err != nil {
-			return err
+			return "", err
 		}
 	}
 
+	if err := writer.Flush(); err != nil {
+		return "", err
+	}
+	if err := file.Close(); err != nil {
+		return "", err
+	}
+
+	// Check the new file's structure before it replaces anything, so a bad write
+	// leaves the existing database untouched.
+	if err := ValidateDatabaseV2(tmpPath); err != nil {
+		return "", fmt.Errorf("written database failed validation: %w", err)
+	}
+
+	// Link the old file as the backup only now: until the rename below succeeds, the link
+	// would share an inode with the live database, which Serato rewrites in place.
+	backupPath := ""
+	if statErr == nil {
+		backupPath, err = linkBackup(path)
+		if err != nil {
+			return "", err
+		}
+	}
+
+	if err := os.Rename(tmpPath, path); err != nil {
+		if backupPath != "" {
+			os.Remove(backupPath)
+		}
+		return "", err
+	}
+	return backupPath, nil
+}
+
+// ValidateDatabaseV2 checks that a Database V2 file is structurally intact: it must start
+// with a vrsn chunk, and its top-level chunks must account for every byte of the file.
+func ValidateDatabaseV2(path string) error {
+	data, err := os.ReadFile(path)
+	if err != nil {
+		return err
+	}
+
+	// ParseTLV rejects truncated chunks and invalid tags, so a clean parse means the
+	// chunk lengths tile the file exactly.
+	chunks, err := tlv.ParseTLV(data)
+	if err != nil {
+		return err
+	}
+	if len(chunks) == 0 || chunks[0].Tag != "vrsn" {
+		return fmt.Errorf("database does not start with a vrsn chunk")
+	}
 	return nil
 }
@@ -0,0 +1,31 @@
+package serato
+
+import (
+	"runtime"
+	"sync"
+)
+
+// parallelFor calls fn for every index in [0, n) on a pool of runtime.NumCPU() goroutines.
+func parallelFor(n int, fn func(i int)) {
+	jobs := make(chan int)
+	var wg sync.WaitGroup
+
+	workers := runtime.NumCPU()
+	if workers > n {
+		workers = n
+	}
+	for w := 0; w < workers; w++ {
+		wg.Add(1)
+		go func() {
+			defer wg.Done()
+			for i := range jobs {
+				fn(i)
+			}
+		}()
+	}
+	for i := 0; i < n; i++ {
+		jobs <- i
+	}
+	close(jobs)
+	wg.Wait()
+}
@@ -2,6 +2,9 @@ package serato
 
 import (
 	"strings"
+	"unicode/utf8"
+
+	"golang.org/x/text/unicode/norm"
 )
 
 // CleanPath prepares a path for comparison by normalizing slashes and removing the drive letter.
@@ -13,3 +16,21 @@ func CleanPath(path string) string {
 	return strings.Trim(p, "/")
 }
 
+// ComparablePath cleans a path with CleanPath and converts it to Unicode NFC, so a file name
+// stored precomposed (Windows, Serato) and decomposed (macOS file systems) compares equal.
+func ComparablePath(path string) string {
+	return toNFC(CleanPath(path))
+}
+
+// toNFC returns s in Unicode normalization form C.
+// ASCII strings are already in NFC and are returned unchanged. Other strings go through
+// norm.NFC.String, which quick-checks the input and also returns it unchanged, without
+// allocating, when it is already in NFC; only decomposed names are rebuilt.
+func toNFC(s string) string {
+	for i := 0; i < len(s); i++ {
+		if s[i] >= utf8.RuneSelf {
+			return norm.NFC.String(s)
+		}
+	}
+	return s
+}
@@ -1,15 +1,48 @@
 package tlv
 
 import (
-	"bytes"
 	"encoding/binary"
 	"fmt"
 	"io"
+	"strings"
+	"unicode/utf16"
+	"unicode/utf8"
+)
 
-	"golang.org/x/text/encoding/unicode"
-	"golang.org/x/text/transform"
+// Byte-lane masks for checking all four bytes of a tag at once.
+const (
+	lanesLow  = 0x01010101
+	lanesHigh = 0x80808080
 )
 
+// knownTags holds the tags found in Serato database and crate files.
+// Looking tags up here lets parsers share one string per tag instead of
+// allocating a new one for every chunk.
+var knownTags = func() map[string]string {
+	tags := []string{
+		"vrsn", "otrk", "ptrk", "osrt", "ovct", "tvcn", "tvcw", "brev",
+		"pfil", "ttyp", "tadd", "talb", "tart", "ttit", "tgen", "tkey",
+		"tcom", "tgrp", "tbit", "tsmp", "tbpm", "tlen", "tmod", "tsiz",
+		"tlbl", "tcmp", "tcmm", "tcor", "trmx", "tcrt", "tsrt", "tdat",
+		"tyea", "uadd", "utme", "ulbl", "utkn", "udsc", "ufsb", "sbav",
+		"bhrt", "bmis", "bply", "blop", "bitu", "bovc", "bcrt", "biro",
+		"bwlb", "bwll", "buns", "bbgl", "bkrk", "bstm",
+	}
+	m := make(map[string]string, len(tags))
+	for _, t := range tags {
+		m[t] = t
+	}
+	return m
+}()
+
+// internTag returns the tag in b as a string, reusing a shared string for known tags.
+func internTag(b []byte) string {
+	if tag, ok := knownTags[string(b)]; ok {
+		return tag
+	}
+	return string(b)
+}
+
 // Chunk represents a TLV chunk.
 type Chunk struct {
 	Tag   string
@@ -19,76 +52,168 @@ type Chunk struct {
 
 // MakeChunk creates a TLV chunk as a byte slice.
 func MakeChunk(tag string, payload []byte) []byte {
-	tagBytes := []byte(tag)
-	lengthBytes := make([]byte, 4)
-	binary.BigEndian.PutUint32(lengthBytes, uint32(len(payload)))
-	return append(append(tagBytes, lengthBytes...), payload...)
+	return AppendChunk(make([]byte, 0, len(tag)+4+len(payload)), tag, payload)
+}
+
+// AppendChunk appends a TLV chunk to dst and returns the extended slice.
+// The tag bytes are written as given, followed by the big-endian payload length.
+func AppendChunk(dst []byte, tag string, payload []byte) []byte {
+	dst = append(dst, tag...)
+	dst = binary.BigEndian.AppendUint32(dst, uint32(len(payload)))
+	return append(dst, payload...)
+}
+
+// AppendU16BEChunk appends a TLV chunk holding s encoded as UTF-16BE to dst.
+// The string is encoded straight into dst and the length is filled in afterwards.
+func AppendU16BEChunk(dst []byte, tag string, s string) []byte {
+	dst = append(dst, tag...)
+	l := len(dst)
+	dst = append(dst, 0, 0, 0, 0)
+	dst = AppendU16BE(dst, s)
+	binary.BigEndian.PutUint32(dst[l:l+4], uint32(len(dst)-l-4))
+	return dst
 }
 
 // WriteChunk writes a TLV chunk to an io.Writer.
+// The header is written separately so the payload is never copied.
 func WriteChunk(writer io.Writer, tag string, payload []byte) error {
-	chunk := MakeChunk(tag, payload)
-	_, err := writer.Write(chunk)
+	header := make([]byte, 0, len(tag)+4)
+	header = append(header, tag...)
+	header = binary.BigEndian.AppendUint32(header, uint32(len(payload)))
+	if _, err := writer.Write(header); err != nil {
+		return err
+	}
+	_, err := writer.Write(payload)
 	return err
 }
 
+// isPrintableTag reports whether all four tag bytes are printable ASCII (0x20-0x7E).
+// The bytes are checked together as one big-endian word: a lane below 0x20 borrows
+// into its high bit on subtraction, and a lane above 0x7E carries into it on addition.
+func isPrintableTag(tag []byte) bool {
+	x := binary.BigEndian.Uint32(tag)
+	below := (x - lanesLow*0x20) &^ x & lanesHigh
+	above := ((x + lanesLow*(0x7F-0x7E)) | x) & lanesHigh
+	return below|above == 0
+}
+
 // EncodeU16BE encodes a string to UTF-16BE.
 func EncodeU16BE(s string) ([]byte, error) {
-	encoder := unicode.UTF16(unicode.BigEndian, unicode.IgnoreBOM).NewEncoder()
-	return encoder.Bytes([]byte(s))
+	return AppendU16BE(make([]byte, 0, 2*len(s)), s), nil
+}
+
+// AppendU16BE appends the UTF-16BE encoding of s to dst and returns the extended slice.
+// Invalid UTF-8 is encoded as U+FFFD.
+func AppendU16BE(dst []byte, s string) []byte {
+	for _, r := range s {
+		if r < 0x10000 {
+			dst = append(dst, byte(r>>8), byte(r))
+			continue
+		}
+		r1, r2 := utf16.EncodeRune(r)
+		dst = append(dst, byte(r1>>8), byte(r1), byte(r2>>8), byte(r2))
+	}
+	return dst
 }
 
 // DecodeU16BE decodes a UTF-16BE byte slice to a string.
+// Unpaired surrogates and a trailing odd byte are decoded as U+FFFD.
 func DecodeU16BE(b []byte) (string, error) {
-	reader := transform.NewReader(bytes.NewReader(b), unicode.UTF16(unicode.BigEndian, unicode.IgnoreBOM).NewDecoder())
-	result, err := io.ReadAll(reader)
-	if err != nil {
-		return "", err
+	// Most paths are ASCII, where every code unit is a zero byte followed by
+	// the character itself; those can be copied out without decoding runes.
+	ascii := len(b)%2 == 0
+	for i := 0; ascii && i < len(b); i += 2 {
+		ascii = b[i] == 0 && b[i+1] < utf8.RuneSelf
 	}
-	return string(result), nil
+	if ascii {
+		var sb strings.Builder
+		sb.Grow(len(b) / 2)
+		for i := 1; i < len(b); i += 2 {
+			sb.WriteByte(b[i])
+		}
+		return sb.String(), nil
+	}
+
+	units := make([]uint16, len(b)/2)
+	for i := range units {
+		units[i] = binary.BigEndian.Uint16(b[2*i:])
+	}
+	s := string(utf16.Decode(units))
+	if len(b)%2 != 0 {
+		s += string(utf8.RuneError)
+	}
+	return s, nil
 }
 
-// IterTLV reads TLV chunks from an io.Reader.
-func IterTLV(reader io.Reader) ([]*Chunk, error) {
-	var chunks []*Chunk
-	for {
-		header := make([]byte, 8)
-		_, err := io.ReadFull(reader, header)
-		if err == io.EOF {
-			break
-		} else if err != nil {
-			return nil, fmt.Errorf("failed to read chunk header: %w", err)
+// ParseTLV parses top-level TLV chunks from a byte slice holding a whole file.
+// Chunk values are sub-slices of buf, so no payload bytes are copied.
+func ParseTLV(buf []byte) ([]*Chunk, error) {
+	count := countChunks(buf)
+	slab := make([]Chunk, count)
+	chunks := make([]*Chunk, 0, count)
+	pos := 0
+	n := len(buf)
+	for pos < n {
+		if pos+8 > n {
+			return nil, fmt.Errorf("failed to read chunk header at offset %d: %w", pos, io.ErrUnexpectedEOF)
 		}
-
-		tag := string(header[0:4])
+		header := buf[pos : pos+8 : pos+8]
+		if !isPrintableTag(header[0:4]) {
+			return nil, fmt.Errorf("invalid chunk tag %q at offset %d", header[0:4], pos)
+		}
+		tag := internTag(header[0:4])
 		size := binary.BigEndian.Uint32(header[4:8])
-
-		value := make([]byte, size)
-		_, err = io.ReadFull(reader, value)
-		if err != nil {
-			return nil, fmt.Errorf("failed to read chunk value for tag %s: %w", tag, err)
+		start := pos + 8
+		if uint64(size) > uint64(n-start) {
+			return nil, fmt.Errorf("failed to read chunk value for tag %s: %w", tag, io.ErrUnexpectedEOF)
 		}
-
-		chunks = append(chunks, &Chunk{Tag: tag, Size: size, Value: value})
+		end := start + int(size)
+		chunk := &slab[len(chunks)]
+		*chunk = Chunk{Tag: tag, Size: size, Value: buf[start:end]}
+		chunks = append(chunks, chunk)
+		pos = end
 	}
 	return chunks, nil
 }
 
 // IterNestedTLV iterates over nested TLV chunks in a byte slice.
 func IterNestedTLV(buf []byte) ([]*Chunk, error) {
-	var chunks []*Chunk
+	count := countChunks(buf)
+	slab := make([]Chunk, count)
+	chunks := make([]*Chunk, 0, count)
 	pos := 0
 	n := len(buf)
 	for pos+8 <= n {
-		tag := string(buf[pos : pos+4])
-		size := binary.BigEndian.Uint32(buf[pos+4 : pos+8])
+		header := buf[pos : pos+8 : pos+8]
+		tag := internTag(header[0:4])
+		size := binary.BigEndian.Uint32(header[4:8])
 		start := pos + 8
-		end := start + int(size)
-		if end > n {
+		if uint64(size) > uint64(n-start) {
 			break
 		}
-		chunks = append(chunks, &Chunk{Tag: tag, Size: uint32(size), Value: buf[start:end]})
+		end := start + int(size)
+		chunk := &slab[len(chunks)]
+		*chunk = Chunk{Tag: tag, Size: size, Value: buf[start:end]}
+		chunks = append(chunks, chunk)
 		pos = end
 	}
 	return chunks, nil
-}
\ No newline at end of file
+}
+
+// countChunks counts the complete chunks at the start of buf by walking only their headers.
+// The parsers use it to allocate all of their Chunk values in one slab.
+func countChunks(buf []byte) int {
+	count := 0
+	pos := 0
+	n := len(buf)
+	for pos+8 <= n {
+		size := binary.BigEndian.Uint32(buf[pos+4 : pos+8])
+		start := pos + 8
+		if uint64(size) > uint64(n-start) {
+			break
+		}
+		count++
+		pos = start + int(size)
+	}
+	return count
+}